@@ -10,13 +10,22 @@ Philosophy:
 - Metadata: Omit (timestamps, UUIDs, etc.)
 
 Goal: 8MB JSONL → 20-50KB markdown with NO semantic loss
+
+File touches (Read/Write/Edit/Grep paths, file arguments of Bash commands)
+are also appended to .session_logs/.file_touches.jsonl (see file_touches.py)
+so past sessions can be looked up by the files they worked on.
 """
 
 import json
+import os
+import re
+import shlex
 import sys
 from pathlib import Path
 from datetime import datetime
 
+from file_touches import TOUCH_INDEX_NAME, append_touches
+
 
 def extract_text_from_content(content):
     """Extract text from various content formats."""
@@ -114,6 +123,166 @@ def summarize_tool_call(tool_name, tool_input):
         return f"🔧 {tool_name}({params})"
 
 
+# Tool name → operation recorded in the file-touch index
+TOUCH_OPS = {
+    'Read': 'read',
+    'Write': 'write',
+    'Edit': 'edit',
+    'MultiEdit': 'edit',
+    'NotebookEdit': 'edit',
+    'Grep': 'grep',
+    'Bash': 'bash',
+}
+
+
+def _normalize_touch_path(path, cwd, roots):
+    """Make a touched path relative to the project root.
+
+    Relative paths are resolved against the tool call's cwd first. roots
+    are candidate project roots as seen by the session (see
+    collect_file_touches); paths outside all of them stay absolute.
+    """
+    if cwd and not os.path.isabs(path):
+        path = os.path.join(cwd, path)
+    path = os.path.normpath(path)
+    if not os.path.isabs(path):
+        return path
+    for root in roots:
+        try:
+            rel = os.path.relpath(path, root)
+        except ValueError:
+            continue
+        if rel != '..' and not rel.startswith('..' + os.sep):
+            return rel
+    return path
+
+
+def _is_file_path(path, cwd):
+    """Whether a tool argument names a file rather than a directory.
+
+    When the session cwd exists locally the path must be an existing file.
+    Otherwise (e.g. a log from another machine) it must end in a file-like
+    name with an extension, e.g. "scripts/run.sh".
+    """
+    if cwd and os.path.isdir(cwd):
+        return os.path.isfile(path if os.path.isabs(path) else os.path.join(cwd, path))
+    return re.search(r'(^|/)[\w.-]*\w\.[A-Za-z]\w{0,7}$', path) is not None
+
+
+def _bash_file_args(command, cwd):
+    """Best-effort list of file paths passed to a shell command."""
+    try:
+        tokens = shlex.split(command, comments=True)
+    except ValueError:
+        return []
+    paths = []
+    for token in tokens:
+        if token.startswith('-') or '://' in token or any(c in token for c in '|&;<>$`*?='):
+            continue
+        if _is_file_path(token, cwd):
+            paths.append(token)
+    return paths
+
+
+def extract_file_touches(tool_name, tool_input, cwd=None, roots=()):
+    """Return [(path, op)] for files a tool call read, edited or searched."""
+    op = TOUCH_OPS.get(tool_name)
+    if not op or not isinstance(tool_input, dict):
+        return []
+
+    if tool_name == 'Bash':
+        paths = _bash_file_args(tool_input.get('command', ''), cwd)
+    elif tool_name == 'Grep':
+        # Grep's path is usually a directory; only single-file searches count
+        path = tool_input.get('path')
+        paths = [path] if isinstance(path, str) and _is_file_path(path, cwd) else []
+    else:
+        path = tool_input.get('file_path') or tool_input.get('notebook_path')
+        paths = [path] if path else []
+
+    touches = []
+    for p in paths:
+        if isinstance(p, str) and p.strip():
+            path = _normalize_touch_path(p, cwd, roots)
+            if path not in ('.', '..'):
+                touches.append((path, op))
+    return touches
+
+
+def find_touch_index(jsonl_path):
+    """Locate the touch index for an archived log (.session_logs ancestor)."""
+    for parent in Path(jsonl_path).resolve().parents:
+        if parent.name == '.session_logs':
+            return parent / TOUCH_INDEX_NAME
+    return None
+
+
+def collect_file_touches(entries, project_root=None):
+    """Aggregate file touches across a session's JSONL entries.
+
+    Paths are made relative to project_root (the host project the log is
+    archived in). Logs copied from another machine record a different
+    absolute root, so the session's launch directory (its first cwd, which
+    is where Claude Code was started) is tried as a fallback root.
+    """
+    touches = {}
+    roots = []
+    if project_root:
+        roots.append(str(Path(project_root).resolve()))
+    launch_cwd = next((e['cwd'] for e in entries if e.get('cwd')), None)
+    if launch_cwd and launch_cwd not in roots:
+        roots.append(launch_cwd)
+
+    def add(tool_name, tool_input, entry):
+        ts = entry.get('timestamp')
+        for key in extract_file_touches(tool_name, tool_input, entry.get('cwd'), roots):
+            if key in touches:
+                touches[key][1] = ts or touches[key][1]
+                touches[key][2] += 1
+            else:
+                touches[key] = [ts, ts, 1]
+
+    for entry in entries:
+        entry_type = entry.get('type', '')
+        if entry_type == 'assistant':
+            content = entry.get('message', {}).get('content', [])
+            if isinstance(content, list):
+                for block in content:
+                    if isinstance(block, dict) and block.get('type') == 'tool_use':
+                        add(block.get('name', ''), block.get('input', {}), entry)
+        elif entry_type == 'tool_use':
+            add(entry.get('name', ''), entry.get('input', {}), entry)
+    return touches
+
+
+def index_file_touches(jsonl_file, entries=None):
+    """Record a session's file touches in its .session_logs touch index.
+
+    Returns the number of (path, op) pairs recorded, or None if the log
+    is not inside a .session_logs directory.
+    """
+    jsonl_path = Path(jsonl_file)
+    index_path = find_touch_index(jsonl_path)
+    if index_path is None:
+        return None
+    if entries is None:
+        entries = []
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    project_root = index_path.parent.parent
+    touches = collect_file_touches(entries, project_root)
+    try:
+        log = str(jsonl_path.resolve().relative_to(project_root))
+    except ValueError:
+        log = str(jsonl_path)
+    append_touches(index_path, jsonl_path.stem, log, touches)
+    return len(touches)
+
+
 def summarize_tool_result(content, tool_name=None):
     """Create a concise summary of a tool result."""
     if not content:
@@ -303,6 +472,12 @@ def convert_session(jsonl_file, md_file):
             if last_type == 'tool':
                 f.write("\n")
 
+        # Link the session to the files it touched
+        try:
+            index_file_touches(jsonl_path, entries)
+        except Exception as e:
+            print(f"Warning: Could not update file-touch index: {e}", file=sys.stderr)
+
         # Report compression ratio
         original_size = jsonl_path.stat().st_size
         new_size = md_path.stat().st_size
@@ -318,8 +493,19 @@ def convert_session(jsonl_file, md_file):
 
 
 def main():
+    if len(sys.argv) >= 3 and sys.argv[1] == '--index-touches':
+        # Backfill the touch index from already-archived logs
+        for jsonl_file in sys.argv[2:]:
+            count = index_file_touches(jsonl_file)
+            if count is None:
+                print(f"Skipping {jsonl_file}: not inside .session_logs/", file=sys.stderr)
+            else:
+                print(f"✓ Indexed {count} file touches: {Path(jsonl_file).name}")
+        sys.exit(0)
+
     if len(sys.argv) != 3:
         print("Usage: convert_session.py <input.jsonl> <output.md>")
+        print("       convert_session.py --index-touches <archived.jsonl>...")
         sys.exit(1)
 
     input_file = sys.argv[1]
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+file_touches.py - Path → sessions index of files each session worked on
+
+Storage:
+- .session_logs/.file_touches.jsonl is the record of truth. It is
+  append-only (written under an flock) and committed with the rest of
+  .session_logs/, so it travels with the project. Each conversion appends
+  one batch per session; a newer batch for the same session (a resumed,
+  re-archived session) supersedes older ones.
+- A path-keyed sqlite mirror in ~/.cache/session-memory answers lookups.
+  It ingests only the bytes appended since its last sync, and rebuilds
+  if the bytes it already ingested have changed (e.g. after a git merge).
+
+Usage:
+    python file_touches.py scripts/mcp_server.py
+    python file_touches.py mcp_server.py --op edit
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows without WSL: no advisory locking
+    fcntl = None
+
+from project_paths import find_project_root, project_cache_path
+
+TOUCH_INDEX_NAME = ".file_touches.jsonl"
+
+OPERATIONS = ("read", "write", "edit", "grep", "bash")
+
+# Seconds to wait for another process's sync to release the write lock
+LOCK_TIMEOUT = 30
+
+
+def touch_index_path(project_root):
+    return Path(project_root) / ".session_logs" / TOUCH_INDEX_NAME
+
+
+def _lock(f, mode):
+    """flock(f, fcntl.<mode>) where available; a no-op elsewhere."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), getattr(fcntl, mode))
+
+
+def append_touches(index_path, session_id, log, touches):
+    """Append one session's touches as a new batch.
+
+    touches maps (path, op) → [first_timestamp, last_timestamp, count].
+    The batch opens with a marker line, so re-converting a session with
+    no touches still clears its older entries.
+    """
+    batch = time.time_ns()
+    lines = [json.dumps({"session": session_id, "batch": batch}) + "\n"]
+    for (path, op), (first, last, count) in sorted(touches.items()):
+        lines.append(json.dumps({
+            "path": path,
+            "op": op,
+            "session": session_id,
+            "batch": batch,
+            "first": first,
+            "last": last,
+            "count": count,
+            "log": log,
+        }) + "\n")
+
+    with open(index_path, "a", encoding="utf-8") as f:
+        _lock(f, "LOCK_EX")
+        try:
+            f.write("".join(lines))
+            f.flush()
+        finally:
+            _lock(f, "LOCK_UN")
+
+
+# ---------------------------------------------------------------------------
+# Lookup mirror
+# ---------------------------------------------------------------------------
+
+
+def open_touch_db(project_root):
+    """Open the sqlite mirror of a project's touch index."""
+    db = sqlite3.connect(
+        str(project_cache_path(project_root, "touches", ".db")),
+        timeout=LOCK_TIMEOUT,
+        isolation_level=None,
+    )
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS batches (session TEXT PRIMARY KEY, batch INTEGER);
+        CREATE TABLE IF NOT EXISTS touches (
+            path TEXT, rpath TEXT, op TEXT, session TEXT,
+            first TEXT, last TEXT, count INTEGER, log TEXT
+        );
+        CREATE INDEX IF NOT EXISTS touches_rpath ON touches (rpath);
+        CREATE INDEX IF NOT EXISTS touches_session ON touches (session);
+    """)
+    return db
+
+
+def _ingest(db, line):
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return
+    session = entry.get("session")
+    if not session:
+        return
+    batch = int(entry.get("batch", 0))
+    row = db.execute("SELECT batch FROM batches WHERE session = ?", (session,)).fetchone()
+    if row is None or batch > row[0]:
+        db.execute("DELETE FROM touches WHERE session = ?", (session,))
+        db.execute("INSERT OR REPLACE INTO batches VALUES (?, ?)", (session, batch))
+    elif batch < row[0]:
+        return
+    path = entry.get("path")
+    if path:
+        db.execute(
+            "INSERT INTO touches VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (path, path[::-1], entry.get("op"), session, entry.get("first"),
+             entry.get("last"), entry.get("count", 1), entry.get("log")),
+        )
+
+
+def sync_touch_db(db, index_path):
+    """Ingest lines appended to the JSONL since the last sync.
+
+    The mirror records how many bytes it has ingested and their sha1. If
+    that prefix no longer matches the file (a git checkout or a merge put
+    other lines before it), the mirror is rebuilt from scratch. Returns
+    False if the JSONL doesn't exist.
+    """
+    if not index_path.exists():
+        return False
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        meta = dict(db.execute("SELECT key, value FROM meta"))
+        offset = int(meta.get("offset", 0))
+        with open(index_path, "rb") as f:
+            _lock(f, "LOCK_SH")
+            try:
+                prefix = f.read(offset)
+                digest = hashlib.sha1(prefix)
+                if len(prefix) < offset or digest.hexdigest() != meta.get("digest"):
+                    db.execute("DELETE FROM touches")
+                    db.execute("DELETE FROM batches")
+                    digest = hashlib.sha1()
+                    offset = 0
+                    f.seek(0)
+                data = f.read()
+            finally:
+                _lock(f, "LOCK_UN")
+        # Only consume complete lines
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].decode("utf-8", "replace").splitlines():
+            _ingest(db, line)
+        digest.update(data[:end])
+        db.execute("DELETE FROM meta")
+        db.executemany("INSERT INTO meta VALUES (?, ?)", [
+            ("offset", str(offset + end)),
+            ("digest", digest.hexdigest()),
+        ])
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+    return True
+
+
+def lookup(project_root, path, operation=""):
+    """Touch entries for a path, newest first; None if there's no index.
+
+    Matches the exact path or any path ending in it ("mcp_server.py"
+    finds "scripts/mcp_server.py") via an index on the reversed path.
+    Absolute paths inside the project are matched by their project-relative
+    form, as that is how they are stored.
+    """
+    needle = str(Path(path.strip())) if path.strip() else ""
+    if needle and Path(needle).is_absolute():
+        try:
+            needle = str(Path(needle).resolve().relative_to(Path(project_root).resolve()))
+        except ValueError:
+            pass
+    db = open_touch_db(project_root)
+    try:
+        if not sync_touch_db(db, touch_index_path(project_root)):
+            return None
+        rev = needle[::-1]
+        sql = ("SELECT path, op, session, first, last, count, log FROM touches "
+               "WHERE (rpath = ? OR (rpath >= ? AND rpath < ?))")
+        # '0' sorts right after '/', so the range is "reversed path + /..."
+        params = [rev, rev + "/", rev + "0"]
+        if operation:
+            sql += " AND op = ?"
+            params.append(operation.strip().lower())
+        sql += " ORDER BY last DESC"
+        keys = ("path", "op", "session", "first", "last", "count", "log")
+        return [dict(zip(keys, row)) for row in db.execute(sql, params)]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="List past sessions that touched a file"
+    )
+    parser.add_argument("path", help="File path: absolute, project-relative, or a trailing part of it")
+    parser.add_argument("--op", choices=OPERATIONS, default="", help="Only this operation")
+
+    args = parser.parse_args()
+
+    entries = lookup(find_project_root(), args.path, args.op)
+    if entries is None:
+        print("No file-touch index (.session_logs/.file_touches.jsonl).", file=sys.stderr)
+        sys.exit(1)
+    if not entries:
+        print("No recorded sessions touched that file.", file=sys.stderr)
+        sys.exit(1)
+    for e in entries:
+        print(f"{e['last']}\t{e['op']}\t{e['path']}\t{e['session']}")
+
+
+if __name__ == "__main__":
+    main()
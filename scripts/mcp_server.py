@@ -10,24 +10,50 @@ Tools:
   - semantic_search: vector search (requires sentence-transformers)
   - read_document: read a specific session/doc file
   - list_sessions: list available session summaries
+  - regex_search: regex/identifier search narrowed by a trigram index
+  - sessions_touching: sessions that read/edited a given file
+
+Tools are async: file I/O runs on a bounded thread pool and embedding
+inference on a dedicated worker, each with a timeout. Tunables:
+  SESSION_MEMORY_IO_WORKERS        I/O pool size (default 8)
+  SESSION_MEMORY_TOOL_TIMEOUT      seconds per I/O-bound call (default 30)
+  SESSION_MEMORY_SEMANTIC_TIMEOUT  seconds per semantic query (default 300)
+
+Run `python3 mcp_server.py --startup-report` to profile server import time.
 """
 
+import asyncio
+import importlib
 import os
 import re
+import sqlite3
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from mcp.server.fastmcp import FastMCP
 
+from project_paths import find_project_root, iter_markdown
+
 mcp = FastMCP("session-memory")
 
+# Tool handlers are async so one slow call (e.g. a semantic query) never
+# blocks the stdio loop. Blocking disk I/O runs on a bounded thread pool;
+# model inference gets its own single worker so it can't starve file reads.
+IO_WORKERS = int(os.environ.get("SESSION_MEMORY_IO_WORKERS", "8"))
+TOOL_TIMEOUT = float(os.environ.get("SESSION_MEMORY_TOOL_TIMEOUT", "30"))
+SEMANTIC_TIMEOUT = float(os.environ.get("SESSION_MEMORY_SEMANTIC_TIMEOUT", "300"))
+
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="sm-io")
+_model_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sm-model")
+
+# In-flight trigram index refresh per project (see _refresh_trigram_index)
+_index_refreshes: dict[Path, asyncio.Future] = {}
 
-def get_project_root() -> Path:
-    """Resolve the host project directory."""
-    env_dir = os.environ.get("CLAUDE_PROJECT_DIR")
-    if env_dir:
-        return Path(env_dir)
-    return Path.cwd()
+# Modules that must never load at server startup. numpy/torch and the
+# embedding stack cost seconds to import; they are pulled in on first use
+# via _load_script_module("semantic_filter"). Checked by --startup-report.
+HEAVY_MODULES = ("numpy", "torch", "sentence_transformers", "semantic_filter")
 
 
 # ---------------------------------------------------------------------------
@@ -36,7 +62,7 @@ def get_project_root() -> Path:
 
 
 @mcp.tool()
-def search_sessions(query: str, top_k: int = 10) -> str:
+async def search_sessions(query: str, top_k: int = 10) -> str:
     """Search past sessions and documentation using keyword matching.
 
     Searches across sessions/, docs/, and .session_logs/ for files
@@ -47,32 +73,15 @@ def search_sessions(query: str, top_k: int = 10) -> str:
         query: Search terms to look for
         top_k: Maximum number of results to return (default 10)
     """
-    project = get_project_root()
-    search_dirs = ["sessions", "docs", ".session_logs"]
-    results = []
+    project = find_project_root()
 
     # Split query into terms for matching
     terms = query.lower().split()
 
-    for dir_name in search_dirs:
-        dir_path = project / dir_name
-        if not dir_path.exists():
-            continue
-        for md_file in dir_path.rglob("*.md"):
-            if "pending" in str(md_file):
-                continue
-            try:
-                content = md_file.read_text(encoding="utf-8")
-                content_lower = content.lower()
-                # Score: count of matching terms
-                score = sum(1 for t in terms if t in content_lower)
-                if score > 0:
-                    # Extract first matching snippet
-                    snippet = _extract_snippet(content, terms)
-                    rel = md_file.relative_to(project)
-                    results.append((score, str(rel), snippet))
-            except Exception:
-                continue
+    try:
+        results = await asyncio.wait_for(_score_files(project, terms), TOOL_TIMEOUT)
+    except asyncio.TimeoutError:
+        return f"Keyword search for '{query}' timed out after {TOOL_TIMEOUT:.0f}s."
 
     results.sort(key=lambda x: -x[0])
     results = results[:top_k]
@@ -91,7 +100,7 @@ def search_sessions(query: str, top_k: int = 10) -> str:
 
 
 @mcp.tool()
-def semantic_search(query: str, top_k: int = 5) -> str:
+async def semantic_search(query: str, top_k: int = 5) -> str:
     """Search past sessions using vector embeddings for semantic similarity.
 
     More powerful than keyword search for conceptual queries like
@@ -102,12 +111,11 @@ def semantic_search(query: str, top_k: int = 5) -> str:
         top_k: Number of results to return (default 5)
     """
     try:
-        # Import from sibling module
-        script_dir = Path(__file__).parent
-        sys.path.insert(0, str(script_dir))
-        from semantic_filter import search, find_project_root
-
-        results = search(query, top_k=top_k, show_snippets=True)
+        semantic_filter = _load_script_module("semantic_filter")
+        results = await _run_model(
+            semantic_filter.search, query, top_k=top_k, show_snippets=True,
+            stream=True,
+        )
 
         if not results:
             return f"No semantic results for '{query}'. Try keyword search instead."
@@ -128,16 +136,123 @@ def semantic_search(query: str, top_k: int = 5) -> str:
             "Install with: pip install sentence-transformers torch\n"
             "Falling back: use the search_sessions tool for keyword search."
         )
+    except asyncio.TimeoutError:
+        return (
+            f"Semantic search for '{query}' timed out after {SEMANTIC_TIMEOUT:.0f}s.\n"
+            "Falling back: use the search_sessions tool for keyword search."
+        )
+
+
+@mcp.tool()
+async def regex_search(pattern: str, ignore_case: bool = False, max_results: int = 50) -> str:
+    """Search sessions and docs for a regular expression, line by line.
+
+    Best for exact identifiers, file paths and error strings, e.g.
+    "get_project_root\\(" or "TypeError: .*NoneType". A trigram index
+    narrows the files scanned, so this stays fast on large archives.
+
+    Args:
+        pattern: Python regular expression
+        ignore_case: Match case-insensitively (default False)
+        max_results: Maximum matching lines to return (default 50)
+    """
+    project = find_project_root()
+    flags = re.IGNORECASE if ignore_case else 0
+    try:
+        regex = re.compile(pattern, flags)
+    except re.error as e:
+        return f"Invalid regex '{pattern}': {e}"
+
+    trigram_index = _load_script_module("trigram_index")
+    try:
+        await asyncio.wait_for(
+            asyncio.shield(_refresh_trigram_index(trigram_index, project)), TOOL_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        return (
+            "The regex index is still being built; the build continues in "
+            "the background — retry regex_search shortly, or use search_sessions."
+        )
+    except sqlite3.Error as e:
+        return f"Regex search index unavailable: {e}. Retry shortly, or use search_sessions."
+
+    try:
+        candidates, total = await _run_io(
+            trigram_index.query_candidates, project, pattern
+        )
+    except asyncio.TimeoutError:
+        return f"Regex search for '{pattern}' timed out after {TOOL_TIMEOUT:.0f}s."
+    except sqlite3.Error as e:
+        return f"Regex search index unavailable: {e}. Retry shortly, or use search_sessions."
+
+    results, scanned_files, timed_out = await _grep_candidates(
+        trigram_index, project, candidates, regex, max_results
+    )
+
+    lines = [f"{rel}:{line_no}: {line.strip()[:200]}" for rel, line_no, line in results]
+    progress = f"{scanned_files}/{len(candidates)} candidate files of {total} indexed"
+    if timed_out:
+        scanned = f"timed out after {progress}; results are partial"
+    else:
+        scanned = f"scanned {progress}"
+    if not lines:
+        return f"No matches for /{pattern}/ ({scanned})."
+
+    header = f"Found {len(lines)} matching line(s) for /{pattern}/ ({scanned}):\n"
+    return "\n".join([header] + lines)
 
 
 @mcp.tool()
-def read_document(path: str) -> str:
+async def sessions_touching(path: str, operation: str = "") -> str:
+    """Find past sessions that read, wrote, edited or searched a file.
+
+    Uses the file-touch index recorded when sessions are archived, so it
+    answers "which sessions edited X?" without a full-text search. Matches
+    the exact project-relative path or any path ending in it, so
+    "mcp_server.py" finds "scripts/mcp_server.py".
+
+    Args:
+        path: File path: absolute, project-relative, or just a trailing part of it
+        operation: Optional filter: read, write, edit, grep or bash
+    """
+    project = find_project_root()
+    file_touches = _load_script_module("file_touches")
+    try:
+        entries = await _run_io(file_touches.lookup, project, path, operation)
+    except asyncio.TimeoutError:
+        return f"File-touch lookup for '{path}' timed out after {TOOL_TIMEOUT:.0f}s."
+    except sqlite3.Error as e:
+        return f"File-touch index unavailable: {e}. Retry shortly."
+
+    if entries is None:
+        return (
+            "No file-touch index yet (.session_logs/.file_touches.jsonl).\n"
+            "It is built as sessions are archived; backfill with:\n"
+            "  python3 scripts/convert_session.py --index-touches .session_logs/*/*.jsonl"
+        )
+    if not entries:
+        qualifier = f" ({operation})" if operation else ""
+        return f"No recorded sessions touched '{path}'{qualifier}."
+
+    sessions = {e["session"] for e in entries}
+    lines = [f"{len(sessions)} session(s) touched '{path}':\n"]
+    for e in entries:
+        when = (e.get("last") or "unknown time").replace("T", " ")[:16]
+        times = f" ×{e['count']}" if e.get("count", 1) > 1 else ""
+        lines.append(f"- {when} **{e['op']}**{times} `{e['path']}` — session {e['session']}")
+        if e.get("log"):
+            lines.append(f"  log: {e['log']}")
+    return "\n".join(lines)
+
+
+@mcp.tool()
+async def read_document(path: str) -> str:
     """Read a session summary, investigation, or other document.
 
     Args:
         path: Relative path from project root (e.g. 'sessions/2025-01-15-api.md')
     """
-    project = get_project_root()
+    project = find_project_root()
     file_path = project / path
 
     # Security: ensure path stays within project
@@ -153,22 +268,37 @@ def read_document(path: str) -> str:
         return f"Only markdown files can be read. Got: {path}"
 
     try:
-        content = file_path.read_text(encoding="utf-8")
+        content = await _run_io(file_path.read_text, encoding="utf-8")
         if len(content) > 50000:
             content = content[:50000] + "\n\n... (truncated, file exceeds 50KB)"
         return content
+    except asyncio.TimeoutError:
+        return f"Reading {path} timed out after {TOOL_TIMEOUT:.0f}s."
     except Exception as e:
         return f"Error reading {path}: {e}"
 
 
 @mcp.tool()
-def list_sessions(include_pending: bool = False) -> str:
+async def list_sessions(include_pending: bool = False) -> str:
     """List available session summaries and their dates.
 
     Args:
         include_pending: Also list pending (unsummarized) sessions
     """
-    project = get_project_root()
+    project = find_project_root()
+    try:
+        return await _run_io(_list_sessions_sync, project, include_pending)
+    except asyncio.TimeoutError:
+        return f"Listing sessions timed out after {TOOL_TIMEOUT:.0f}s."
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _list_sessions_sync(project: Path, include_pending: bool) -> str:
+    """Blocking body of list_sessions; runs on the I/O pool."""
     lines = []
 
     # Session summaries
@@ -207,9 +337,111 @@ def list_sessions(include_pending: bool = False) -> str:
     return "\n".join(lines) if lines else "No session memory files found."
 
 
-# ---------------------------------------------------------------------------
-# Helpers
-# ---------------------------------------------------------------------------
+async def _grep_candidates(trigram_index, project: Path, candidates: list[str],
+                           regex: re.Pattern, max_results: int):
+    """Scan candidate files in chunks of IO_WORKERS until max_results lines.
+
+    Chunks keep results in candidate order and let the scan stop as soon as
+    enough lines are found. Returns (results, files scanned, timed out);
+    on TOOL_TIMEOUT the matches found so far are kept.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TOOL_TIMEOUT
+    results = []
+    scanned = 0
+    while scanned < len(candidates) and len(results) < max_results:
+        chunk = candidates[scanned:scanned + IO_WORKERS]
+        remaining = max_results - len(results)
+        try:
+            per_file = await asyncio.wait_for(
+                asyncio.gather(*(
+                    loop.run_in_executor(
+                        _io_pool, trigram_index.grep_file, project / rel, regex, remaining
+                    )
+                    for rel in chunk
+                )),
+                max(0.0, deadline - loop.time()),
+            )
+        except asyncio.TimeoutError:
+            return results, scanned, True
+        for rel, matches in zip(chunk, per_file):
+            results.extend((rel, line_no, line) for line_no, line in matches)
+        scanned += len(chunk)
+    return results[:max_results], scanned, False
+
+
+def _load_script_module(name: str):
+    """Import a sibling module from scripts/ on first use."""
+    module = sys.modules.get(name)
+    if module is None:
+        script_dir = str(Path(__file__).parent)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        module = importlib.import_module(name)
+    return module
+
+
+def _refresh_trigram_index(trigram_index, project: Path) -> asyncio.Future:
+    """Start a trigram index refresh, or join the one already running.
+
+    A refresh outlives a timed-out regex_search (it keeps running on the
+    I/O pool), so later calls wait on the same future instead of
+    starting a second build.
+    """
+    future = _index_refreshes.get(project)
+    if future is None or future.done():
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(_io_pool, trigram_index.refresh_index, project)
+        _index_refreshes[project] = future
+    return future
+
+
+async def _run_io(func, *args, **kwargs):
+    """Run a blocking I/O call on the I/O pool, bounded by TOOL_TIMEOUT."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_io_pool, lambda: func(*args, **kwargs))
+    return await asyncio.wait_for(future, TOOL_TIMEOUT)
+
+
+async def _run_model(func, *args, **kwargs):
+    """Run model inference on the dedicated executor, bounded by SEMANTIC_TIMEOUT.
+
+    On timeout or cancellation the awaiting tool returns immediately; the
+    in-flight encode finishes in the background and the next semantic call
+    queues behind it rather than competing for CPU.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_model_pool, lambda: func(*args, **kwargs))
+    return await asyncio.wait_for(future, SEMANTIC_TIMEOUT)
+
+
+def _score_file(path: Path, project: Path, terms: list[str]) -> tuple[int, str, str] | None:
+    """Score one file against the query terms; runs on the I/O pool.
+
+    Returns (score, relative path, snippet), or None if nothing matched, so
+    only the small result tuple (not the file's text) outlives the call.
+    """
+    try:
+        content = path.read_text(encoding="utf-8")
+    except Exception:
+        return None
+    content_lower = content.lower()
+    # Score: count of matching terms
+    score = sum(1 for t in terms if t in content_lower)
+    if score == 0:
+        return None
+    # Extract first matching snippet
+    return score, str(path.relative_to(project)), _extract_snippet(content, terms)
+
+
+async def _score_files(project: Path, terms: list[str]) -> list[tuple[int, str, str]]:
+    """List the corpus and score each file on the I/O pool."""
+    loop = asyncio.get_running_loop()
+    files = await loop.run_in_executor(_io_pool, lambda: list(iter_markdown(project)))
+    scored = await asyncio.gather(
+        *(loop.run_in_executor(_io_pool, _score_file, f, project, terms) for f in files)
+    )
+    return [r for r in scored if r is not None]
 
 
 def _extract_snippet(content: str, terms: list[str], context: int = 80) -> str:
@@ -229,5 +461,52 @@ def _extract_snippet(content: str, terms: list[str], context: int = 80) -> str:
     return ""
 
 
+def startup_report(top_n: int = 15) -> int:
+    """Print an -X importtime breakdown of importing this module.
+
+    Spawns a fresh interpreter so the numbers reflect a cold server start.
+    Returns non-zero if any HEAVY_MODULES were imported eagerly, so the
+    report can gate regressions in CI or a pre-commit hook.
+    """
+    import subprocess
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_server"],
+        cwd=str(Path(__file__).parent),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        return proc.returncode
+
+    # Lines look like: "import time:       412 |       1290 |   mcp.types"
+    timings = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s*(\d+) \|\s*(\d+) \| (.*)$", line)
+        if match:
+            timings.append((int(match[2]), int(match[1]), match[3]))
+
+    # Nesting is shown by indentation; only top-level imports sum to total
+    top_level = [t for t in timings if not t[2].startswith("  ")]
+    total_us = sum(t[0] for t in top_level)
+    heavy = sorted({
+        t[2].strip().split(".")[0] for t in timings
+    } & set(HEAVY_MODULES))
+
+    print(f"Server import time: {total_us / 1000:.1f} ms "
+          f"({len(timings)} modules)\n")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(timings, reverse=True)[:top_n]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name.strip()}")
+
+    if heavy:
+        print(f"\nRegression: heavy modules imported at startup: {', '.join(heavy)}")
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
+    if "--startup-report" in sys.argv[1:]:
+        sys.exit(startup_report())
     mcp.run()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+project_paths.py - Shared project discovery and cache locations
+
+Used by mcp_server.py, semantic_filter.py, trigram_index.py and
+session_context.py so they agree on which project they serve, which
+documents they search, and where per-project caches live.
+Stdlib only; safe to import at MCP server startup.
+
+Environment:
+    CLAUDE_PROJECT_DIR        Host project directory (set by Claude Code)
+    SESSION_MEMORY_CACHE_DIR  Cache root (default ~/.cache/session-memory)
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+# Directories searched for markdown, relative to the project root
+SEARCH_DIRS = ["sessions", "docs", ".session_logs"]
+
+CACHE_DIR = Path(os.environ.get(
+    "SESSION_MEMORY_CACHE_DIR", Path.home() / ".cache" / "session-memory"
+))
+
+
+def find_project_root():
+    """Find project root (the host project, not the plugin directory).
+
+    Priority: CLAUDE_PROJECT_DIR env var > cwd traversal > cwd fallback.
+    """
+    # Prefer explicit env var (set by Claude Code)
+    env_dir = os.environ.get("CLAUDE_PROJECT_DIR")
+    if env_dir:
+        return Path(env_dir).resolve()
+
+    # Traverse up from cwd (not script location, which may be in plugin dir)
+    current = Path.cwd().resolve()
+    while current != current.parent:
+        if (current / ".git").exists() or (current / "CLAUDE.md").exists():
+            return current
+        current = current.parent
+
+    # Fallback to cwd
+    return Path.cwd().resolve()
+
+
+def iter_markdown(project_root):
+    """Yield non-pending markdown files under the search directories."""
+    for dir_name in SEARCH_DIRS:
+        dir_path = Path(project_root) / dir_name
+        if not dir_path.exists():
+            continue
+        for md_file in dir_path.rglob("*.md"):
+            # Skip pending files (not yet summarized)
+            if "pending" in str(md_file):
+                continue
+            yield md_file
+
+
+def project_cache_path(project_root, prefix, suffix):
+    """Per-project file under CACHE_DIR, e.g. CACHE_DIR/trigrams-<hash>.db.
+
+    Caches live outside the project so they never end up in git.
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha1(str(Path(project_root).resolve()).encode()).hexdigest()[:16]
+    return CACHE_DIR / f"{prefix}-{digest}{suffix}"
@@ -5,6 +5,16 @@
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 PLUGIN_DIR="$(cd "$SCRIPT_DIR/.." && pwd)"
 VENV_DIR="$PLUGIN_DIR/.venv"
+REQUIREMENTS="$SCRIPT_DIR/requirements.txt"
+
+# Readiness stamp: written after mcp is verified importable. Its contents
+# are keyed on the venv location, its pyvenv.cfg (interpreter version) and
+# requirements.txt, so the import probe only reruns when one of them changes.
+STAMP="$VENV_DIR/.mcp-ready"
+
+# Install spec for the MCP server dependency, taken from requirements.txt
+MCP_SPEC=$(grep -m1 -E '^mcp[<>=!~ ]' "$REQUIREMENTS" 2>/dev/null)
+MCP_SPEC="${MCP_SPEC:-mcp}"
 
 # Create venv if it doesn't exist
 if [ ! -f "$VENV_DIR/bin/python3" ]; then
@@ -13,12 +23,22 @@ if [ ! -f "$VENV_DIR/bin/python3" ]; then
         echo "Error: Could not create Python venv. Ensure python3-venv is installed." >&2
         exit 1
     fi
-    "$VENV_DIR/bin/pip" install --quiet mcp 2>/dev/null
+    "$VENV_DIR/bin/pip" install --quiet "$MCP_SPEC" 2>/dev/null
 fi
 
-# Ensure mcp is installed
-if ! "$VENV_DIR/bin/python3" -c "import mcp" 2>/dev/null; then
-    "$VENV_DIR/bin/pip" install --quiet mcp 2>/dev/null
+READY_KEY=$( { echo "$VENV_DIR"; cat "$VENV_DIR/pyvenv.cfg" "$REQUIREMENTS" 2>/dev/null; } | cksum)
+
+# Ensure mcp is installed (skipped while the stamp matches)
+if [ ! -f "$STAMP" ] || [ "$(cat "$STAMP" 2>/dev/null)" != "$READY_KEY" ]; then
+    if "$VENV_DIR/bin/python3" -c "import mcp.server.fastmcp" 2>/dev/null; then
+        echo "$READY_KEY" > "$STAMP"
+    else
+        "$VENV_DIR/bin/pip" install --quiet "$MCP_SPEC" 2>/dev/null
+        # Re-probe only after installing
+        if "$VENV_DIR/bin/python3" -c "import mcp.server.fastmcp" 2>/dev/null; then
+            echo "$READY_KEY" > "$STAMP"
+        fi
+    fi
 fi
 
 exec "$VENV_DIR/bin/python3" "$SCRIPT_DIR/mcp_server.py" "$@"
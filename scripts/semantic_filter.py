@@ -7,119 +7,198 @@ Features:
 - Document chunking with overlap for better retrieval
 - Deduplication by document
 - Explicit file paths as fallback
+- Optional ONNX Runtime backend (fp32 or dynamic int8) with torch fallback
+- Streaming mode: lazy document iteration, batched encoding, cached
+  embeddings and a running top-k heap, so memory is bounded by batch size
+
+Environment:
+    SESSION_MEMORY_MODEL      Model name or local directory (default BAAI/bge-large-en-v1.5)
+    SESSION_MEMORY_BACKEND    torch | onnx | onnx-int8 (default torch); ONNX
+                              needs sentence-transformers>=3.2 + optimum[onnxruntime]
+    SESSION_MEMORY_THREADS    Inference threads (default: runtime's choice)
+    SESSION_MEMORY_CACHE_DIR  Cache root for ONNX exports and embeddings
+                              (default ~/.cache/session-memory)
+    SESSION_MEMORY_ONNX_DIR   Where exported ONNX models are cached
+                              (default $SESSION_MEMORY_CACHE_DIR/onnx)
+    SESSION_MEMORY_BATCH_SIZE Chunks encoded per batch in streaming mode (default 64)
 
 Usage:
     python semantic_filter.py "search query"
     python semantic_filter.py "search query" --top-k 10
     python semantic_filter.py "search query" --snippets
     python semantic_filter.py "search query" file1.md file2.md  # explicit files
+    python semantic_filter.py "search query" --stream           # bounded memory
+    python semantic_filter.py --benchmark                       # compare backends
 """
 
 import argparse
+import heapq
+import itertools
+import json
 import os
+import platform
+import re
+import sqlite3
+import subprocess
 import sys
+import time
 from pathlib import Path
 
+from project_paths import CACHE_DIR, find_project_root, iter_markdown, project_cache_path
+
+MODEL_NAME = os.environ.get("SESSION_MEMORY_MODEL", "BAAI/bge-large-en-v1.5")
+BACKEND = os.environ.get("SESSION_MEMORY_BACKEND", "torch")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+# backend="onnx" and export_dynamic_quantized_onnx_model arrived in 3.2
+ONNX_MIN_ST_VERSION = (3, 2)
+THREADS = int(os.environ.get("SESSION_MEMORY_THREADS", "0")) or None
+ONNX_DIR = Path(os.environ.get("SESSION_MEMORY_ONNX_DIR", CACHE_DIR / "onnx"))
+BATCH_SIZE = int(os.environ.get("SESSION_MEMORY_BATCH_SIZE", "64"))
+
 # Global model (lazy-loaded)
 MODEL = None
 
 
-def get_model():
-    """Lazy-load the embedding model."""
+def get_model(backend=None):
+    """Lazy-load the embedding model.
+
+    Uses the configured backend; ONNX backends fall back to torch if the
+    export or ONNX Runtime is unavailable. Raises ImportError if
+    sentence-transformers is missing (callers such as the MCP server
+    report it; the CLI exits).
+    """
     global MODEL
     if MODEL is None:
+        backend = backend or BACKEND
         try:
             from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(f"sentence-transformers not installed ({e})") from e
+
+        if backend in ("onnx", "onnx-int8"):
+            try:
+                MODEL = load_onnx_model(quantize=backend == "onnx-int8")
+            except Exception as e:
+                print(f"Warning: ONNX backend unavailable ({e}); using torch", file=sys.stderr)
+        elif backend != "torch":
+            print(f"Warning: unknown backend '{backend}'; using torch", file=sys.stderr)
+
+        if MODEL is None:
             print("Loading embedding model...", file=sys.stderr)
-            MODEL = SentenceTransformer("BAAI/bge-large-en-v1.5")
-        except ImportError:
-            print("Error: sentence-transformers not installed", file=sys.stderr)
-            print("Install with: pip install sentence-transformers torch", file=sys.stderr)
-            sys.exit(1)
+            if THREADS:
+                import torch
+                torch.set_num_threads(THREADS)
+            MODEL = SentenceTransformer(MODEL_NAME, device="cpu")
     return MODEL
 
 
-def find_project_root():
-    """Find project root (the host project, not the plugin directory).
+def _quantization_config():
+    """Pick the dynamic int8 quantization target for this CPU."""
+    machine = platform.machine().lower()
+    if machine in ("arm64", "aarch64"):
+        return "arm64"
+    return "avx2"
 
-    Priority: CLAUDE_PROJECT_DIR env var > cwd traversal > cwd fallback.
-    """
-    # Prefer explicit env var (set by Claude Code)
-    env_dir = os.environ.get("CLAUDE_PROJECT_DIR")
-    if env_dir:
-        return Path(env_dir)
-
-    # Traverse up from cwd (not script location, which may be in plugin dir)
-    current = Path.cwd().resolve()
-    while current != current.parent:
-        if (current / ".git").exists() or (current / "CLAUDE.md").exists():
-            return current
-        current = current.parent
 
-    # Fallback to cwd
-    return Path.cwd().resolve()
+def load_onnx_model(quantize=False):
+    """Load MODEL_NAME through ONNX Runtime, exporting it on first use.
 
+    The export is written to ONNX_DIR/<model>/ and reused afterwards, so
+    once it exists no network access is needed. Pointing
+    SESSION_MEMORY_MODEL at a local model directory keeps the first
+    export offline as well.
+    """
+    import onnxruntime
+    import sentence_transformers
+    from sentence_transformers import SentenceTransformer
+
+    version = tuple(int(p) for p in re.findall(r"\d+", sentence_transformers.__version__)[:2])
+    if version < ONNX_MIN_ST_VERSION:
+        raise RuntimeError(
+            f"sentence-transformers {sentence_transformers.__version__} has no ONNX "
+            "backend; install sentence-transformers>=3.2"
+        )
+
+    export_dir = ONNX_DIR / re.sub(r"[^A-Za-z0-9._-]+", "--", MODEL_NAME.strip("/"))
+    fp32_file = export_dir / "onnx" / "model.onnx"
+
+    if not fp32_file.exists():
+        print(f"Exporting {MODEL_NAME} to ONNX (one-time)...", file=sys.stderr)
+        model = SentenceTransformer(MODEL_NAME, device="cpu", backend="onnx")
+        model.save_pretrained(str(export_dir))
+
+    file_name = "onnx/model.onnx"
+    if quantize:
+        config = _quantization_config()
+        file_name = f"onnx/model_qint8_{config}.onnx"
+        if not (export_dir / file_name).exists():
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+            print(f"Quantizing ONNX model to int8 ({config})...", file=sys.stderr)
+            model = SentenceTransformer(str(export_dir), device="cpu", backend="onnx")
+            export_dynamic_quantized_onnx_model(model, config, str(export_dir))
+
+    session_options = onnxruntime.SessionOptions()
+    if THREADS:
+        session_options.intra_op_num_threads = THREADS
+
+    print(f"Loading embedding model ({file_name})...", file=sys.stderr)
+    return SentenceTransformer(
+        str(export_dir),
+        device="cpu",
+        backend="onnx",
+        model_kwargs={
+            "file_name": file_name,
+            "provider": "CPUExecutionProvider",
+            "session_options": session_options,
+        },
+    )
 
-def gather_documents(project_root, explicit_paths=None):
-    """Gather markdown documents from search directories or explicit paths."""
-    documents = []
 
+def iter_document_paths(project_root, explicit_paths=None):
+    """Yield (path, relative_path) for candidate documents without reading them."""
     if explicit_paths:
         # Use explicit file paths
         for path_str in explicit_paths:
             path = Path(path_str)
             if path.exists() and path.is_file():
-                try:
-                    content = path.read_text(encoding="utf-8")
-                    if len(content) >= 50:
-                        documents.append({
-                            "path": path,
-                            "relative_path": path.name,
-                            "content": content
-                        })
-                except Exception as e:
-                    print(f"Warning: Could not read {path}: {e}", file=sys.stderr)
+                yield path, path.name
             else:
                 # Try as glob pattern
                 parent = path.parent if path.parent.exists() else Path(".")
                 for match in parent.glob(path.name):
                     if match.is_file():
-                        try:
-                            content = match.read_text(encoding="utf-8")
-                            if len(content) >= 50:
-                                documents.append({
-                                    "path": match,
-                                    "relative_path": match.name,
-                                    "content": content
-                                })
-                        except Exception:
-                            pass
+                        yield match, match.name
     else:
         # Auto-discover from standard directories
-        search_dirs = ["sessions", "docs", ".session_logs"]
+        for md_file in iter_markdown(project_root):
+            yield md_file, md_file.relative_to(project_root)
 
-        for dir_name in search_dirs:
-            dir_path = project_root / dir_name
-            if not dir_path.exists():
-                continue
 
-            for md_file in dir_path.rglob("*.md"):
-                # Skip pending files (not yet summarized)
-                if "pending" in str(md_file):
-                    continue
-                try:
-                    content = md_file.read_text(encoding="utf-8")
-                    if len(content) < 50:
-                        continue
-                    documents.append({
-                        "path": md_file,
-                        "relative_path": md_file.relative_to(project_root),
-                        "content": content
-                    })
-                except Exception as e:
-                    print(f"Warning: Could not read {md_file}: {e}", file=sys.stderr)
+def read_document(path):
+    """Read a document, returning None if unreadable or too short to index."""
+    try:
+        content = path.read_text(encoding="utf-8")
+    except Exception as e:
+        print(f"Warning: Could not read {path}: {e}", file=sys.stderr)
+        return None
+    return content if len(content) >= 50 else None
+
 
-    return documents
+def iter_documents(project_root, explicit_paths=None):
+    """Lazily yield documents one at a time (see gather_documents)."""
+    for path, relative_path in iter_document_paths(project_root, explicit_paths):
+        content = read_document(path)
+        if content is not None:
+            yield {
+                "path": path,
+                "relative_path": relative_path,
+                "content": content
+            }
+
+
+def gather_documents(project_root, explicit_paths=None):
+    """Gather markdown documents from search directories or explicit paths."""
+    return list(iter_documents(project_root, explicit_paths))
 
 
 def chunk_document(content, chunk_size=1000, overlap=200):
@@ -137,8 +216,11 @@ def chunk_document(content, chunk_size=1000, overlap=200):
     return chunks if chunks else [content]
 
 
-def search(query, top_k=5, show_snippets=False, explicit_paths=None):
+def search(query, top_k=5, show_snippets=False, explicit_paths=None, stream=False):
     """Perform semantic search and return ranked results."""
+    if stream:
+        return search_streaming(query, top_k, show_snippets, explicit_paths)
+
     import numpy as np
 
     project_root = find_project_root()
@@ -198,19 +280,257 @@ def search(query, top_k=5, show_snippets=False, explicit_paths=None):
     return results
 
 
+def _model_key(model):
+    """Identify the embedding space so cached vectors are never mixed."""
+    backend = BACKEND if getattr(model, "backend", "torch") == "onnx" else "torch"
+    return f"{MODEL_NAME}|{backend}"
+
+
+def open_embedding_cache(project_root):
+    """Open the per-project chunk embedding cache.
+
+    Lives under CACHE_DIR rather than in the project so it never ends up
+    in git. Entries are keyed on absolute path, mtime, size and model.
+    """
+    db = sqlite3.connect(str(project_cache_path(project_root, "embeddings", ".db")), timeout=30)
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS docs (
+            path TEXT PRIMARY KEY, mtime REAL, size INTEGER, model TEXT, chunks INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS chunks (
+            path TEXT, idx INTEGER, vector BLOB, PRIMARY KEY (path, idx)
+        );
+    """)
+    return db
+
+
+def search_streaming(query, top_k=5, show_snippets=False, explicit_paths=None,
+                     batch_size=None):
+    """Semantic search with memory bounded by batch size, not corpus size.
+
+    Documents are visited lazily. Unchanged documents score from cached
+    embeddings; the rest are chunked and encoded in fixed-size batches
+    (and cached). Each document's best chunk feeds a top_k min-heap once
+    all of its chunks are scored, so at most one batch of chunk text,
+    the documents it spans, and top_k results are held at once.
+    """
+    import numpy as np
+
+    batch_size = batch_size or BATCH_SIZE
+    project_root = find_project_root()
+    model = get_model()
+    model_key = _model_key(model)
+    query_embedding = model.encode([query], normalize_embeddings=True)[0].astype(np.float32)
+
+    heap = []        # (score, seq, relative_path, path, chunk_idx); min at heap[0]
+    open_docs = {}   # docs with chunks still waiting to be scored
+    batch = []       # (key, chunk_idx, text)
+    seq = itertools.count()
+    stats = {"docs": 0, "cached": 0, "encoded": 0}
+
+    def finish(key):
+        doc = open_docs.pop(key)
+        stats["docs"] += 1
+        if not doc["cached"]:
+            db.execute(
+                "INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?, ?)",
+                (key, doc["mtime"], doc["size"], model_key, doc["chunks"]),
+            )
+        item = (doc["score"], next(seq), doc["relative_path"], doc["path"], doc["idx"])
+        if len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item[0] > heap[0][0]:
+            heapq.heapreplace(heap, item)
+
+    def update(key, idxs, sims):
+        doc = open_docs[key]
+        best = int(np.argmax(sims))
+        if sims[best] > doc["score"]:
+            doc["score"] = float(sims[best])
+            doc["idx"] = idxs[best]
+        doc["remaining"] -= len(idxs)
+        if doc["remaining"] == 0:
+            finish(key)
+
+    def flush():
+        if not batch:
+            return
+        vectors = model.encode(
+            [text for _, _, text in batch],
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+        db.executemany(
+            "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)",
+            [(key, idx, vec.tobytes()) for (key, idx, _), vec in zip(batch, vectors)],
+        )
+        sims = vectors @ query_embedding
+        scored = zip(batch, sims)
+        for key, group in itertools.groupby(scored, key=lambda item: item[0][0]):
+            group = list(group)
+            update(key, [entry[1] for entry, _ in group], np.array([sim for _, sim in group]))
+        db.commit()
+        stats["encoded"] += len(batch)
+        batch.clear()
+
+    db = open_embedding_cache(project_root)
+    try:
+        for path, relative_path in iter_document_paths(project_root, explicit_paths):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            key = str(path.resolve())
+            doc = {
+                "path": path, "relative_path": relative_path,
+                "mtime": st.st_mtime, "size": st.st_size,
+                "score": float("-inf"), "idx": 0, "cached": False,
+            }
+
+            row = db.execute(
+                "SELECT mtime, size, model, chunks FROM docs WHERE path = ?", (key,)
+            ).fetchone()
+            if row and row[:3] == (st.st_mtime, st.st_size, model_key):
+                rows = db.execute(
+                    "SELECT idx, vector FROM chunks WHERE path = ? ORDER BY idx", (key,)
+                ).fetchall()
+                if len(rows) == row[3]:
+                    vectors = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32)
+                    open_docs[key] = dict(doc, cached=True, chunks=len(rows), remaining=len(rows))
+                    stats["cached"] += len(rows)
+                    update(key, [r[0] for r in rows],
+                           vectors.reshape(len(rows), -1) @ query_embedding)
+                    continue
+
+            content = read_document(path)
+            if content is None:
+                continue
+            chunks = chunk_document(content)
+            db.execute("DELETE FROM chunks WHERE path = ?", (key,))
+            open_docs[key] = dict(doc, chunks=len(chunks), remaining=len(chunks))
+            for idx, chunk in enumerate(chunks):
+                batch.append((key, idx, chunk))
+                if len(batch) >= batch_size:
+                    flush()
+        flush()
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Searched {stats['docs']} documents ({stats['cached']} cached chunks, "
+          f"{stats['encoded']} encoded)", file=sys.stderr)
+
+    results = []
+    for score, _, relative_path, path, idx in sorted(heap, reverse=True):
+        snippet = None
+        if show_snippets:
+            # Only the winners are re-read to recover their snippet text
+            content = read_document(path) or ""
+            chunks = chunk_document(content)
+            snippet = chunks[min(idx, len(chunks) - 1)][:200]
+        results.append({"path": relative_path, "score": score, "snippet": snippet})
+    return results
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark_backend(backend, max_chunks=256):
+    """Load one backend and time encoding a sample of the corpus."""
+    documents = gather_documents(find_project_root())
+    chunks = [c for doc in documents for c in chunk_document(doc["content"])][:max_chunks]
+    if not chunks:
+        chunks = ["session memory benchmark sentence " * 20] * max_chunks
+
+    start = time.perf_counter()
+    model = get_model(backend)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model.encode(chunks, normalize_embeddings=True, show_progress_bar=False)
+    encode_s = time.perf_counter() - start
+
+    return {
+        "requested": backend,
+        "loaded": getattr(model, "backend", "torch"),
+        "chunks": len(chunks),
+        "load_s": load_s,
+        "chunks_per_s": len(chunks) / encode_s if encode_s > 0 else 0.0,
+        "rss_mb": _peak_rss_mb(),
+    }
+
+
+def benchmark(backends=BACKENDS, max_chunks=256):
+    """Compare encode throughput and peak RSS across backends.
+
+    Each backend runs in a fresh interpreter so its RSS is not inflated
+    by models loaded earlier.
+    """
+    rows = []
+    for backend in backends:
+        print(f"Benchmarking {backend}...", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--benchmark-backend", backend,
+             "--benchmark-chunks", str(max_chunks)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"Warning: {backend} benchmark failed:\n{proc.stderr}", file=sys.stderr)
+            continue
+        rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"\nModel: {MODEL_NAME}  threads: {THREADS or 'default'}")
+    print(f"{'backend':<10} {'loaded':<8} {'chunks':>6} {'load s':>8} {'chunks/s':>9} {'peak RSS':>10}")
+    for r in rows:
+        print(f"{r['requested']:<10} {r['loaded']:<8} {r['chunks']:>6} "
+              f"{r['load_s']:>8.1f} {r['chunks_per_s']:>9.1f} {r['rss_mb']:>8.0f}MB")
+    return rows
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Semantic search across project documents"
     )
-    parser.add_argument("query", help="Search query")
+    parser.add_argument("query", nargs="?", help="Search query")
     parser.add_argument("files", nargs="*", help="Optional: specific files to search")
     parser.add_argument("--top-k", type=int, default=5, help="Number of results (default: 5)")
     parser.add_argument("--snippets", action="store_true", help="Show matching snippets")
+    parser.add_argument("--stream", action="store_true",
+                        help="Bounded-memory streaming search with cached embeddings")
+    parser.add_argument("--backend", choices=BACKENDS,
+                        help="Inference backend (default: $SESSION_MEMORY_BACKEND or torch)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare encode throughput and RSS across backends")
+    parser.add_argument("--benchmark-backend", choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--benchmark-chunks", type=int, default=256,
+                        help="Chunks to encode per backend in --benchmark (default: 256)")
 
     args = parser.parse_args()
 
+    if args.benchmark_backend:
+        print(json.dumps(benchmark_backend(args.benchmark_backend, args.benchmark_chunks)))
+        return
+    if args.benchmark:
+        sys.exit(0 if benchmark(max_chunks=args.benchmark_chunks) else 1)
+    if not args.query:
+        parser.error("the following arguments are required: query")
+    if args.backend:
+        global BACKEND
+        BACKEND = args.backend
+
     explicit_paths = args.files if args.files else None
-    results = search(args.query, top_k=args.top_k, show_snippets=args.snippets, explicit_paths=explicit_paths)
+    try:
+        results = search(args.query, top_k=args.top_k, show_snippets=args.snippets,
+                         explicit_paths=explicit_paths, stream=args.stream)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        print("Install with: pip install sentence-transformers torch", file=sys.stderr)
+        sys.exit(1)
 
     if not results:
         print("No results found.", file=sys.stderr)
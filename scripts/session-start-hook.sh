@@ -2,6 +2,7 @@
 # Session Start Hook (plugin) - Injects context for the session-memory skill
 # Output from this script (exit 0) is added to Claude's context
 
+START_DIR="$(pwd)"
 PROJECT_DIR="${CLAUDE_PROJECT_DIR:-$(pwd)}"
 cd "$PROJECT_DIR" 2>/dev/null || exit 0
 
@@ -15,8 +16,18 @@ fi
 echo "=== SESSION MEMORY CONTEXT ==="
 echo ""
 
-# Show scratchpad
-if [ -f "scratchpad.md" ]; then
+# Scratchpad and most relevant session summaries, packed into a token
+# budget (SESSION_MEMORY_CONTEXT_TOKENS) and cached until they change.
+# Output is buffered so a slow or failed run falls back to the plain view.
+CONTEXT="$PLUGIN_ROOT/scripts/session_context.py"
+CONTEXT_OK=false
+TIMEOUT_CMD=""
+command -v timeout >/dev/null 2>&1 && TIMEOUT_CMD="timeout 10"
+if [ -f "$CONTEXT" ] && CONTEXT_OUT=$($TIMEOUT_CMD python3 "$CONTEXT" --cwd "$START_DIR" 2>/dev/null); then
+    CONTEXT_OK=true
+    echo "$CONTEXT_OUT"
+    echo ""
+elif [ -f "scratchpad.md" ]; then
     echo "## Scratchpad"
     echo ""
     head -50 scratchpad.md
@@ -40,8 +51,8 @@ if [ -d "$PENDING_DIR" ]; then
     fi
 fi
 
-# Show most recent session summary
-if [ -d "sessions" ]; then
+# Fallback: show most recent session summary
+if [ "$CONTEXT_OK" = false ] && [ -d "sessions" ]; then
     LAST=$(ls -t sessions/*.md 2>/dev/null | head -1)
     if [ -n "$LAST" ] && [ -f "$LAST" ]; then
         echo "## Last Session"
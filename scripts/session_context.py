@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+session_context.py - Token-budgeted context assembly for the SessionStart hook
+
+Features:
+- Ranks sessions/*.md by recency, mentions of the current git branch and
+  of the directory Claude was started in
+- Reads only sessions/*.md (small summaries), never the raw archive, so it
+  stays fast enough to run synchronously in the hook
+- Packs the scratchpad and best session excerpts into a token budget
+- Caches the assembled output until the corpus, branch or cwd changes
+
+Environment:
+    SESSION_MEMORY_CONTEXT_TOKENS  Token budget (default 2000)
+    SESSION_MEMORY_CACHE_DIR       Cache root (default ~/.cache/session-memory)
+
+Usage:
+    python session_context.py
+    python session_context.py --budget 4000 --cwd "$PWD"
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+
+from project_paths import find_project_root, project_cache_path
+
+TOKEN_BUDGET = int(os.environ.get("SESSION_MEMORY_CONTEXT_TOKENS", "2000"))
+
+# Rough chars-per-token for English/markdown; good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+# Share of the budget the scratchpad may use; sessions get the rest
+SCRATCHPAD_SHARE = 0.4
+
+# Cap per session so one long summary can't crowd out the others
+MAX_SESSION_SHARE = 0.5
+
+RECENCY_HALF_LIFE_DAYS = 14
+BRANCH_WEIGHT = 1.0
+CWD_WEIGHT = 0.5
+
+# Branch names too generic to say anything about relevance
+GENERIC_BRANCHES = {"main", "master", "develop", "dev", "trunk", "head"}
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text, tokens):
+    """Trim text to roughly `tokens`, cutting at a line boundary."""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text, False
+    cut = text.rfind("\n", 0, limit)
+    if cut < limit // 2:
+        cut = limit
+    return text[:cut].rstrip(), True
+
+
+def current_branch(project_root):
+    """Current git branch name, or None outside a repo / on detached HEAD."""
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+            cwd=str(project_root), capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    branch = proc.stdout.strip()
+    if proc.returncode != 0 or not branch or branch.lower() in GENERIC_BRANCHES:
+        return None
+    return branch
+
+
+def relevance_terms(project_root, branch, cwd):
+    """Search terms derived from the branch and the start directory."""
+    terms = {}
+    if branch:
+        terms[branch] = BRANCH_WEIGHT
+        # "feature/trigram-index" is usually discussed as "trigram-index"
+        leaf = branch.rsplit("/", 1)[-1]
+        if len(leaf) >= 3:
+            terms.setdefault(leaf, BRANCH_WEIGHT)
+    if cwd:
+        try:
+            rel = Path(cwd).resolve().relative_to(Path(project_root).resolve())
+        except ValueError:
+            rel = None
+        if rel and str(rel) != ".":
+            terms.setdefault(str(rel), CWD_WEIGHT)
+            if len(rel.name) >= 3:
+                terms.setdefault(rel.name, CWD_WEIGHT)
+    return terms
+
+
+def session_date(path):
+    """Date from a YYYY-MM-DD filename prefix, else the file's mtime."""
+    match = re.match(r"(\d{4}-\d{2}-\d{2})", path.name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y-%m-%d").timestamp()
+        except ValueError:
+            pass
+    return path.stat().st_mtime
+
+
+def rank_sessions(project_root, sessions, terms):
+    """Return [(score, path)] best first."""
+    now = time.time()
+    scores = {}
+    for path in sessions:
+        age_days = max(0.0, (now - session_date(path)) / 86400)
+        scores[path] = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    # Summaries are a few KB each, so reading them beats any index lookup
+    # (and never blocks on an index build held by the MCP server)
+    if terms:
+        for path in sessions:
+            try:
+                content = path.read_text(encoding="utf-8", errors="replace").lower()
+            except OSError:
+                continue
+            for term, weight in terms.items():
+                if term.lower() in content:
+                    scores[path] += weight
+
+    return sorted(((s, p) for p, s in scores.items()), key=lambda x: (-x[0], x[1].name))
+
+
+def assemble(project_root, budget, branch=None, cwd=None):
+    """Build the context block for the given token budget."""
+    parts = []
+    remaining = budget
+
+    scratchpad = project_root / "scratchpad.md"
+    if scratchpad.exists():
+        text = scratchpad.read_text(encoding="utf-8", errors="replace").strip()
+        text, truncated = truncate_to_tokens(text, int(budget * SCRATCHPAD_SHARE))
+        if truncated:
+            text += "\n\n(scratchpad truncated)"
+        parts.append(f"## Scratchpad\n\n{text}\n")
+        remaining -= estimate_tokens(parts[-1])
+
+    sessions_dir = project_root / "sessions"
+    sessions = sorted(sessions_dir.glob("*.md")) if sessions_dir.exists() else []
+    if not sessions or remaining <= 0:
+        return "\n".join(parts)
+
+    ranked = rank_sessions(
+        project_root, sessions, relevance_terms(project_root, branch, cwd)
+    )
+    per_session = int(budget * MAX_SESSION_SHARE)
+    included = []
+    for _, path in ranked:
+        header = f"### {path.name}\n\n"
+        allowance = min(per_session, remaining - estimate_tokens(header))
+        if allowance < 50:
+            break
+        text = path.read_text(encoding="utf-8", errors="replace").strip()
+        text, truncated = truncate_to_tokens(text, allowance)
+        if truncated:
+            rel = path.relative_to(project_root)
+            text += f"\n\n(excerpt — read_document('{rel}') for the full summary)"
+        included.append(header + text + "\n")
+        remaining -= estimate_tokens(included[-1])
+
+    if included:
+        parts.append("## Relevant Sessions\n")
+        parts.extend(included)
+    others = len(ranked) - len(included)
+    if others > 0:
+        parts.append(f"({others} more session summaries in sessions/ — use list_sessions)\n")
+    return "\n".join(parts)
+
+
+def cache_key(project_root, budget, branch, cwd):
+    """Fingerprint of everything the assembled output depends on."""
+    h = hashlib.sha1()
+    h.update(f"{Path(project_root).resolve()}|{budget}|{branch}|{cwd}".encode())
+    files = [project_root / "scratchpad.md"]
+    sessions_dir = project_root / "sessions"
+    if sessions_dir.exists():
+        files.extend(sorted(sessions_dir.glob("*.md")))
+    for path in files:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        h.update(f"{path.name}|{st.st_mtime}|{st.st_size}".encode())
+    # Recency scores drift daily even if no file changes
+    h.update(datetime.now().strftime("%Y-%m-%d").encode())
+    return h.hexdigest()
+
+
+def build_context(project_root, budget=TOKEN_BUDGET, cwd=None):
+    """Return the context block, reusing the cached copy when still valid."""
+    branch = current_branch(project_root)
+    key = cache_key(project_root, budget, branch, cwd)
+    cache_file = None
+    try:
+        cache_file = project_cache_path(project_root, "context", ".md")
+        cached_key, cached = cache_file.read_text(encoding="utf-8").split("\n", 1)
+        if cached_key == key:
+            return cached
+    except (OSError, ValueError):
+        pass
+
+    output = assemble(project_root, budget, branch, cwd)
+    if cache_file is not None:
+        try:
+            cache_file.write_text(f"{key}\n{output}", encoding="utf-8")
+        except OSError:
+            pass
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Assemble token-budgeted session context for SessionStart"
+    )
+    parser.add_argument("--budget", type=int, default=TOKEN_BUDGET,
+                        help=f"Token budget (default: {TOKEN_BUDGET})")
+    parser.add_argument("--cwd", help="Directory Claude was started in (default: cwd)")
+
+    args = parser.parse_args()
+    print(build_context(find_project_root(), args.budget, args.cwd or os.getcwd()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+trigram_index.py - Trigram-indexed regex search across project documents
+
+Features:
+- Codesearch-style trigram posting index over sessions/, docs/, .session_logs/
+- Regex is analysed for literal runs that every match must contain; only
+  documents holding all of their trigrams are scanned with the real regex
+- Incremental refresh on each query (changed files by mtime/size)
+- Index stored outside the project in ~/.cache/session-memory
+
+Environment:
+    SESSION_MEMORY_CACHE_DIR  Cache root (default ~/.cache/session-memory)
+
+Usage:
+    python trigram_index.py 'get_project_root\\('
+    python trigram_index.py 'TypeError: .*None' --ignore-case --max-results 20
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import threading
+
+from project_paths import find_project_root, iter_markdown, project_cache_path
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Above this many alternatives a regex is treated as unindexable
+MAX_ALTERNATIVES = 32
+
+# Seconds to wait for another process's refresh to release the write lock
+LOCK_TIMEOUT = 30
+
+# One refresh at a time within a process; other processes are serialised
+# by the sqlite write lock taken in update_index()
+_refresh_lock = threading.Lock()
+
+
+def trigrams(text):
+    """Set of case-folded trigrams in text."""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+def open_index(project_root):
+    """Open (creating if needed) the trigram index for a project."""
+    db = sqlite3.connect(
+        str(project_cache_path(project_root, "trigrams", ".db")),
+        timeout=LOCK_TIMEOUT,
+        isolation_level=None,
+    )
+    # WAL lets queries read the last committed index while a refresh writes
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS files (
+            id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime REAL, size INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS postings (
+            trigram TEXT, file_id INTEGER, PRIMARY KEY (trigram, file_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+    """)
+    return db
+
+
+def update_index(db, project_root):
+    """Bring the index in line with the files on disk.
+
+    Only files whose mtime or size changed are re-read. Returns
+    (indexed, removed) counts.
+
+    The write lock is taken before `files` is read, so concurrent
+    refreshes (other threads, other sessions, the SessionStart hook)
+    queue behind each other instead of inserting the same paths twice.
+    Raises sqlite3.OperationalError if the lock isn't free within
+    LOCK_TIMEOUT seconds.
+    """
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        indexed, removed = _update_index_locked(db, project_root)
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+    return indexed, removed
+
+
+def _update_index_locked(db, project_root):
+    known = {
+        path: (file_id, mtime, size)
+        for file_id, path, mtime, size in db.execute("SELECT id, path, mtime, size FROM files")
+    }
+    indexed = 0
+    for md_file in iter_markdown(project_root):
+        rel = str(md_file.relative_to(project_root))
+        try:
+            st = md_file.stat()
+        except OSError:
+            continue
+        entry = known.pop(rel, None)
+        if entry and entry[1:] == (st.st_mtime, st.st_size):
+            continue
+        try:
+            content = md_file.read_text(encoding="utf-8")
+        except Exception as e:
+            print(f"Warning: Could not read {md_file}: {e}", file=sys.stderr)
+            continue
+        if entry:
+            file_id = entry[0]
+            db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+            db.execute("UPDATE files SET mtime = ?, size = ? WHERE id = ?",
+                       (st.st_mtime, st.st_size, file_id))
+        else:
+            # Upsert: safe even if `files` changed since it was read
+            db.execute(
+                "INSERT INTO files (path, mtime, size) VALUES (?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size",
+                (rel, st.st_mtime, st.st_size),
+            )
+            file_id = db.execute("SELECT id FROM files WHERE path = ?", (rel,)).fetchone()[0]
+            db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        db.executemany(
+            "INSERT OR IGNORE INTO postings VALUES (?, ?)",
+            ((t, file_id) for t in trigrams(content)),
+        )
+        indexed += 1
+
+    # Whatever is left in `known` no longer exists on disk
+    for file_id, _, _ in known.values():
+        db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+    return indexed, len(known)
+
+
+# ---------------------------------------------------------------------------
+# Regex analysis
+# ---------------------------------------------------------------------------
+
+
+def _required_literals(parsed):
+    """Literal strings every match must contain, as alternatives.
+
+    Returns a list of alternatives, each a set of strings that all occur
+    in any text matching that alternative. [set()] means "no constraint".
+    """
+    alternatives = [set()]
+    run = []
+
+    def flush():
+        if run:
+            literal = "".join(run)
+            for alt in alternatives:
+                alt.add(literal)
+            run.clear()
+
+    for op, arg in parsed:
+        if op == sre_constants.LITERAL:
+            run.append(chr(arg))
+            continue
+        flush()
+        sub = None
+        if op == sre_constants.SUBPATTERN:
+            sub = _required_literals(arg[-1])
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, _, item = arg
+            if low >= 1:
+                sub = _required_literals(item)
+        elif op == sre_constants.BRANCH:
+            sub = []
+            for branch in arg[1]:
+                sub.extend(_required_literals(branch))
+        if sub is None or sub == [set()]:
+            continue
+        if len(alternatives) * len(sub) > MAX_ALTERNATIVES:
+            continue
+        alternatives = [a | b for a in alternatives for b in sub]
+    flush()
+    return alternatives
+
+
+def trigram_query(pattern):
+    """Translate a regex into alternatives of required trigram sets.
+
+    Returns None when the regex yields no usable trigrams in some
+    alternative, meaning every document is a candidate.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    query = []
+    for literals in _required_literals(parsed):
+        grams = set()
+        for literal in literals:
+            grams |= trigrams(literal)
+        if not grams:
+            return None
+        query.append(grams)
+    return query
+
+
+def candidate_paths(db, query):
+    """Relative paths of documents that may match a trigram query."""
+    if query is None:
+        return [row[0] for row in db.execute("SELECT path FROM files ORDER BY path")]
+    file_ids = set()
+    for grams in query:
+        grams = sorted(grams)
+        placeholders = ", ".join("?" * len(grams))
+        rows = db.execute(
+            f"SELECT file_id FROM postings WHERE trigram IN ({placeholders}) "
+            f"GROUP BY file_id HAVING COUNT(*) = ?",
+            (*grams, len(grams)),
+        )
+        file_ids.update(row[0] for row in rows)
+    if not file_ids:
+        return []
+    ids = sorted(file_ids)
+    placeholders = ", ".join("?" * len(ids))
+    rows = db.execute(
+        f"SELECT path FROM files WHERE id IN ({placeholders}) ORDER BY path", ids
+    )
+    return [row[0] for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+
+def refresh_index(project_root):
+    """Refresh a project's index; returns (indexed, removed) counts."""
+    with _refresh_lock:
+        db = open_index(project_root)
+        try:
+            return update_index(db, project_root)
+        finally:
+            db.close()
+
+
+def query_candidates(project_root, pattern):
+    """Look up (candidate paths, total indexed files) without refreshing."""
+    db = open_index(project_root)
+    try:
+        total = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return candidate_paths(db, trigram_query(pattern)), total
+    finally:
+        db.close()
+
+
+def find_candidates(project_root, pattern):
+    """Refresh the index and return (candidate paths, total indexed files)."""
+    refresh_index(project_root)
+    return query_candidates(project_root, pattern)
+
+
+def grep_file(path, regex, max_matches):
+    """Return (line_number, line) pairs in path matching a compiled regex."""
+    matches = []
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line_no, line in enumerate(f, 1):
+                if regex.search(line):
+                    matches.append((line_no, line.rstrip("\n")))
+                    if len(matches) >= max_matches:
+                        break
+    except OSError:
+        pass
+    return matches
+
+
+def regex_search(pattern, ignore_case=False, max_results=50, project_root=None):
+    """Search documents for a regex, narrowed by the trigram index.
+
+    Returns (results, candidates, total) where results is a list of
+    (relative_path, line_number, line).
+    """
+    project_root = project_root or find_project_root()
+    regex = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    candidates, total = find_candidates(project_root, pattern)
+    results = []
+    for rel in candidates:
+        remaining = max_results - len(results)
+        if remaining <= 0:
+            break
+        for line_no, line in grep_file(project_root / rel, regex, remaining):
+            results.append((rel, line_no, line))
+    return results, len(candidates), total
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Trigram-indexed regex search across project documents"
+    )
+    parser.add_argument("pattern", help="Python regular expression")
+    parser.add_argument("-i", "--ignore-case", action="store_true", help="Case-insensitive match")
+    parser.add_argument("--max-results", type=int, default=50, help="Maximum matching lines (default: 50)")
+
+    args = parser.parse_args()
+
+    try:
+        results, candidates, total = regex_search(
+            args.pattern, ignore_case=args.ignore_case, max_results=args.max_results
+        )
+    except re.error as e:
+        print(f"Invalid regex: {e}", file=sys.stderr)
+        sys.exit(2)
+    except sqlite3.Error as e:
+        print(f"Trigram index error: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    print(f"Scanned {candidates}/{total} indexed documents", file=sys.stderr)
+    if not results:
+        print("No matches found.", file=sys.stderr)
+        sys.exit(1)
+    for rel, line_no, line in results:
+        print(f"{rel}:{line_no}: {line[:200]}")
+
+
+if __name__ == "__main__":
+    main()